@@ -244,9 +244,9 @@ async function showChartForAsset(index) {
   async function loadAndRender() {
     const timeframe = timeframeSelect.value;
     try {
-      const dataResp = await fetch(`${rawUrl(`historical_${asset.symbol.replace('/', '_')}.json`)}?t=${Date.now()}`);
+      const dataResp = await fetch(`${rawUrl(`historical/${asset.symbol.replace('/', '_')}.json`)}?t=${Date.now()}`);
       const hist = dataResp.ok ? await dataResp.json() : null;
-      const points = hist && hist[timeframe] ? hist[timeframe] : [];
+      const points = hist && hist[timeframe] ? seriesToPoints(hist[timeframe]) : [];
       renderChart(points, asset, timeframe);
     } catch (err) {
       console.error(err);
@@ -258,6 +258,15 @@ async function showChartForAsset(index) {
   await loadAndRender();
 }
 
+// Convertir una serie de arrays paralelos {t, o, h, l, c} en la lista de
+// velas que espera Chart.js.  Los archivos antiguos ya guardaban una lista de
+// velas y se devuelven tal cual.
+function seriesToPoints(series) {
+  if (Array.isArray(series)) return series;
+  const { t = [], o = [], h = [], l = [], c = [] } = series;
+  return t.map((time, i) => ({ t: time, o: o[i], h: h[i], l: l[i], c: c[i] }));
+}
+
 // Renderizar el gráfico de velas usando Chart.js
 function renderChart(dataPoints, asset, timeframe) {
   const ctx = document.getElementById('candlestickChart').getContext('2d');
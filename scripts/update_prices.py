@@ -25,76 +25,214 @@ the box in GitHub Actions without any additional dependencies.
 """
 
 import base64
+import bisect
+import concurrent.futures
 import datetime as _dt
+import gzip
+import http.client
 import json
 import os
 import smtplib
 import ssl
 import sys
+import threading
 import time
 import urllib.error
 import urllib.parse
-import urllib.request
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 
-def fetch_price(symbol: str) -> float:
-    """Fetch the current market price for a given asset symbol.
+# Root of the repository, where the watchlist and generated files live.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-    Yahoo Finance uses ticker symbols to represent both stocks and
-    cryptocurrencies.  Crypto tickers generally use the ``-USD`` suffix
-    (e.g. ``BTC-USD``).  This function makes a GET request to the
-    ``query1.finance.yahoo.com`` quote endpoint and parses the JSON
-    response to extract the ``regularMarketPrice``.
+# Directory holding one historical data file per symbol.  Keeping them out of
+# the repo root avoids cluttering it as the watchlist grows.
+HIST_DIR = os.path.join(REPO_ROOT, "historical")
 
-    Parameters
-    ----------
-    symbol:
-        The ticker symbol of the asset (e.g. ``AAPL`` or ``BTC-USD``).
 
-    Returns
-    -------
-    float
-        The last traded price of the asset.
+# HTTP status codes that are retried with exponential backoff, together with
+# the retry policy used by :func:`fetch_json`.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 0.5
+
+# Keep‑alive HTTPS connections, one per host and per thread.
+# ``http.client`` connections are not thread safe, so each worker thread
+# keeps its own instead of sharing a single one.
+_connections = threading.local()
+
+
+def _get_connection(host: str, timeout: float) -> http.client.HTTPSConnection:
+    """Return the keep‑alive connection to ``host`` for the current thread."""
+    pool = getattr(_connections, "pool", None)
+    if pool is None:
+        pool = _connections.pool = {}
+    conn = pool.get(host)
+    if conn is None:
+        conn = pool[host] = http.client.HTTPSConnection(host, timeout=timeout)
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+
+def _drop_connection(host: str) -> None:
+    """Close and forget the current thread's connection to ``host``."""
+    conn = getattr(_connections, "pool", {}).pop(host, None)
+    if conn is not None:
+        conn.close()
+
+
+def fetch_json(url: str, timeout: float = 15) -> Any:
+    """GET ``url`` over a reused HTTPS connection and decode the JSON body.
+
+    Opening a new TCP+TLS connection for every Yahoo request dominates the
+    run time, so connections are kept alive between calls (see
+    :func:`_get_connection`).  Responses are requested gzip‑compressed, which
+    shrinks the chart payloads several times over.  Connection errors and
+    the statuses in ``RETRY_STATUSES`` are retried up to ``MAX_RETRIES``
+    times with exponential backoff.
 
     Raises
     ------
     RuntimeError
-        If the price cannot be retrieved (e.g. due to network errors or
-        missing fields).
+        If the server answers with a non‑2xx status that is not retried or
+        retries are exhausted.
     """
-    url = f"https://query1.finance.yahoo.com/v7/finance/quote?symbols={urllib.parse.quote(symbol)}"
-    try:
-        with urllib.request.urlopen(url, timeout=15) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-    except Exception as exc:
-        raise RuntimeError(f"Error fetching price for {symbol}: {exc}") from exc
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    headers = {
+        "User-Agent": "Mozilla/5.0",
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip",
+    }
+    for attempt in range(MAX_RETRIES + 1):
+        delay = BACKOFF_FACTOR * (2 ** attempt)
+        conn = _get_connection(parts.netloc, timeout)
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError):
+            _drop_connection(parts.netloc)
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(delay)
+            continue
+        if resp.will_close:
+            _drop_connection(parts.netloc)
+        if resp.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+            time.sleep(delay)
+            continue
+        if not 200 <= resp.status < 300:
+            # Redirects are not followed; Yahoo's API endpoints do not use them.
+            raise RuntimeError(f"HTTP {resp.status} {resp.reason} for {url}")
+        if resp.getheader("Content-Encoding", "").lower() == "gzip":
+            body = gzip.decompress(body)
+        return json.loads(body.decode("utf-8"))
+
+
+# Maximum number of symbols accepted by a single request to the Yahoo quote
+# endpoint.
+QUOTE_BATCH_SIZE = 20
+
 
+def _fetch_quote_chunk(chunk: List[str]) -> Dict[str, float]:
+    """Fetch the prices of at most ``QUOTE_BATCH_SIZE`` symbols in one request."""
+    url = (
+        "https://query1.finance.yahoo.com/v7/finance/quote?symbols="
+        + urllib.parse.quote_plus(",".join(chunk))
+    )
     try:
-        result = data["quoteResponse"]["result"][0]
-        price = result["regularMarketPrice"]
-        if price is None:
-            raise ValueError("No price returned")
-        return float(price)
+        data = fetch_json(url, timeout=15)
+        results = data["quoteResponse"]["result"]
     except Exception as exc:
-        raise RuntimeError(f"Malformed response for {symbol}: {data}") from exc
+        print(f"Error fetching prices for {', '.join(chunk)}: {exc}", file=sys.stderr)
+        return {}
+
+    # Yahoo echoes symbols in upper case; map them back to the spelling
+    # used in the watchlist.
+    requested = {symbol.upper(): symbol for symbol in chunk}
+    prices: Dict[str, float] = {}
+    for result in results:
+        symbol = result.get("symbol")
+        price = result.get("regularMarketPrice")
+        if symbol is None or price is None:
+            continue
+        prices[requested.get(symbol.upper(), symbol)] = float(price)
+    return prices
+
+
+def fetch_prices(
+    symbols: List[str], executor: concurrent.futures.Executor
+) -> Dict[str, float]:
+    """Fetch the current market prices for several asset symbols at once.
 
+    Yahoo Finance uses ticker symbols to represent both stocks and
+    cryptocurrencies.  Crypto tickers generally use the ``-USD`` suffix
+    (e.g. ``BTC-USD``).  The ``query1.finance.yahoo.com`` quote endpoint
+    accepts a comma‑separated list of symbols, so the symbols are requested
+    in chunks of ``QUOTE_BATCH_SIZE`` and the ``regularMarketPrice`` of each
+    result is extracted from the JSON response.
+
+    Parameters
+    ----------
+    symbols:
+        The ticker symbols of the assets (e.g. ``["AAPL", "BTC-USD"]``).
+    executor:
+        The executor on which the chunks are requested concurrently.
 
-def send_email(subject: str, body: str, sender: str, password: str, recipient: str) -> None:
-    """Send an email using Gmail's SMTP server.
+    Returns
+    -------
+    dict
+        A mapping of symbol to its last traded price.  Symbols whose price
+        cannot be retrieved (e.g. due to network errors or missing fields)
+        are omitted and the failure is reported on stderr.
+    """
+    chunks = [symbols[i:i + QUOTE_BATCH_SIZE] for i in range(0, len(symbols), QUOTE_BATCH_SIZE)]
+    prices: Dict[str, float] = {}
+    for chunk_prices in executor.map(_fetch_quote_chunk, chunks):
+        prices.update(chunk_prices)
+    for symbol in symbols:
+        if symbol not in prices:
+            print(f"No price returned for {symbol}", file=sys.stderr)
+    return prices
+
+
+def send_emails(
+    messages: List[Tuple[str, str, str]],
+    sender: str,
+    password: str,
+    on_sent: Callable[[int], None],
+) -> None:
+    """Send several emails over a single Gmail SMTP session.
+
+    Logging in to Gmail costs a TLS and AUTH handshake, so all pending alerts
+    are delivered over one connection instead of one connection per alert.
 
     Parameters
     ----------
-    subject:
-        The subject line of the email.
-    body:
-        The plain‑text body of the email.
+    messages:
+        ``(subject, body, recipient)`` tuples, where ``body`` is the
+        plain‑text body of the email and ``recipient`` the email address to
+        which the alert will be sent.
     sender:
-        The Gmail address used to send the email.
+        The Gmail address used to send the emails.
     password:
         The password or app password associated with ``sender``.
-    recipient:
-        The email address to which the alert will be sent.
+    on_sent:
+        Callback invoked with the index of each message in ``messages`` as
+        soon as it has been accepted by the server, so that callers can
+        record it even if a later step fails.  A failure to deliver one
+        message is reported on stderr and does not prevent the remaining
+        ones from being sent.  Errors while closing the session are reported
+        on stderr as well, since the messages have already been delivered at
+        that point.
+
+    Raises
+    ------
+    Exception
+        If the connection or login to the SMTP server fails.
 
     Notes
     -----
@@ -102,10 +240,23 @@ def send_email(subject: str, body: str, sender: str, password: str, recipient: s
     authentication is enabled.  See the README for more details.
     """
     context = ssl.create_default_context()
-    message = f"Subject: {subject}\n\n{body}"
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context) as server:
+    server = smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context)
+    try:
         server.login(sender, password)
-        server.sendmail(sender, recipient, message)
+        for index, (subject, body, recipient) in enumerate(messages):
+            message = f"Subject: {subject}\n\n{body}"
+            try:
+                server.sendmail(sender, recipient, message)
+            except Exception as exc:
+                print(f"Failed to send email to {recipient}: {exc}", file=sys.stderr)
+                continue
+            on_sent(index)
+    finally:
+        try:
+            server.quit()
+        except Exception as exc:
+            print(f"Error closing SMTP session: {exc}", file=sys.stderr)
+            server.close()
 
 
 def load_json_file(path: str) -> Any:
@@ -120,16 +271,39 @@ def load_json_file(path: str) -> Any:
         return None
 
 
-def save_json_file(path: str, data: Any) -> None:
-    """Write data to a JSON file with pretty formatting."""
+def save_json_file(path: str, data: Any, compact: bool = False) -> None:
+    """Write data to a JSON file with pretty formatting.
+
+    When ``compact`` is true the data is written on a single line without
+    whitespace instead.  This is used for the large, machine‑read historical
+    files, where indentation roughly doubles the file size and the amount of
+    text to serialize.
+    """
+    if compact:
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    else:
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+    # Write the whole document with a single call and flush it to disk
+    # before the atomic rename, so that an interrupted run never leaves a
+    # truncated file behind.
     tmp_path = path + ".tmp"
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+    with open(tmp_path, "wb", buffering=1 << 16) as f:
+        f.write((text + "\n").encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
     os.replace(tmp_path, path)
 
 
-def fetch_historical(symbol: str, interval: str, range_param: str) -> List[Dict[str, Any]]:
+# Keys of the parallel arrays making up a candle series.
+SERIES_KEYS = ("t", "o", "h", "l", "c")
+
+
+def empty_series() -> Dict[str, List[Any]]:
+    """Return a candle series without any candles."""
+    return {key: [] for key in SERIES_KEYS}
+
+
+def fetch_historical(symbol: str, interval: str, range_param: str) -> Dict[str, List[Any]]:
     """Fetch historical OHLC data for a symbol from Yahoo Finance.
 
     Parameters
@@ -145,13 +319,15 @@ def fetch_historical(symbol: str, interval: str, range_param: str) -> List[Dict[
 
     Returns
     -------
-    list of dict
-        A list of candlestick points with keys ``t`` (Unix timestamp
-        milliseconds), ``o``, ``h``, ``l``, ``c``.
+    dict
+        The candlesticks as parallel arrays under the keys ``t`` (Unix
+        timestamp milliseconds), ``o``, ``h``, ``l``, ``c``.  Storing one list
+        per field instead of one dict per candle keeps both the memory
+        footprint and the JSON output small.
 
     Notes
     -----
-    The function catches exceptions and returns an empty list upon failure
+    The function catches exceptions and returns an empty series upon failure
     rather than propagating exceptions to the caller.  This avoids breaking
     the entire update cycle if a single symbol fails to fetch.
     """
@@ -160,12 +336,11 @@ def fetch_historical(symbol: str, interval: str, range_param: str) -> List[Dict[
         f"?range={range_param}&interval={interval}&indicators=quote&includeTimestamps=true"
     )
     try:
-        with urllib.request.urlopen(url, timeout=20) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
+        data = fetch_json(url, timeout=20)
         chart = data.get("chart", {})
         error = chart.get("error")
         if error:
-            return []
+            return empty_series()
         result = chart.get("result", [])[0]
         timestamps = result.get("timestamp", [])
         ohlc = result.get("indicators", {}).get("quote", [{}])[0]
@@ -173,22 +348,233 @@ def fetch_historical(symbol: str, interval: str, range_param: str) -> List[Dict[
         highs = ohlc.get("high", [])
         lows = ohlc.get("low", [])
         closes = ohlc.get("close", [])
-        points = []
+        series = empty_series()
+        t_col, o_col, h_col, l_col, c_col = (series[key] for key in SERIES_KEYS)
         for ts, o, h, l, c in zip(timestamps, opens, highs, lows, closes):
             if None in (o, h, l, c):
                 continue
-            points.append({
-                "t": int(ts) * 1000,
-                "o": float(o),
-                "h": float(h),
-                "l": float(l),
-                "c": float(c)
-            })
-        return points
+            t_col.append(int(ts) * 1000)
+            o_col.append(float(o))
+            h_col.append(float(h))
+            l_col.append(float(l))
+            c_col.append(float(c))
+        return series
     except Exception as exc:
-        # Return empty list on failure to avoid interrupting the update process
+        # Return an empty series on failure to avoid interrupting the update process
         print(f"Failed to fetch historical data for {symbol} ({interval}): {exc}", file=sys.stderr)
-        return []
+        return empty_series()
+
+
+# Candle intervals written to each historical file, with the range requested
+# from the chart API for each of them.
+HISTORICAL_INTERVALS = (("4h", "1mo"), ("1d", "1y"))
+
+# Candle intervals derived locally instead of being requested: the weekly
+# candles are built from the year of daily candles fetched for ``1d``.
+DERIVED_INTERVALS = {"1wk": "1d"}
+
+# Only the most recent part of the daily series (about three months) is
+# written out for the ``1d`` chart; the full year is used for ``1wk``.
+DAILY_WINDOW_MS = 92 * 86400 * 1000
+
+# Seconds for which the stored candles of each fetched interval are reused
+# before being downloaded again.  Daily (and therefore weekly) candles change
+# slowly, so most runs only need to refresh the 4h series.
+HISTORICAL_TTL = {"4h": 3600, "1d": 86400}
+
+# Number of worker threads used to download market data concurrently.
+MAX_WORKERS = 16
+
+
+def trim_series(series: Dict[str, List[Any]], since_ms: int) -> Dict[str, List[Any]]:
+    """Return the candles of ``series`` starting at or after ``since_ms``."""
+    start = bisect.bisect_left(series["t"], since_ms)
+    return {key: series[key][start:] for key in SERIES_KEYS}
+
+
+def resample_weekly(series: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """Aggregate a daily candle series into weekly candles.
+
+    Candles are grouped by ISO calendar week (UTC) rather than by a fixed
+    number of candles, so that stocks (five sessions a week) and crypto
+    (seven) are both handled.  Each weekly candle takes the timestamp and
+    open of the first day, the highest high, the lowest low and the close of
+    the last day.
+    """
+    weekly = empty_series()
+    t_col, o_col, h_col, l_col, c_col = (weekly[key] for key in SERIES_KEYS)
+    current_week = None
+    for t, o, h, l, c in zip(*(series[key] for key in SERIES_KEYS)):
+        week = _dt.datetime.fromtimestamp(t / 1000, _dt.timezone.utc).isocalendar()[:2]
+        if week != current_week:
+            current_week = week
+            t_col.append(t)
+            o_col.append(o)
+            h_col.append(h)
+            l_col.append(l)
+            c_col.append(c)
+        else:
+            h_col[-1] = max(h_col[-1], h)
+            l_col[-1] = min(l_col[-1], l)
+            c_col[-1] = c
+    return weekly
+
+
+def historical_path(symbol: str) -> str:
+    """Return the path of the historical data file for ``symbol``.
+
+    The file lives under ``HIST_DIR`` and uses a deterministic filename
+    based on the symbol.
+    """
+    return os.path.join(HIST_DIR, f"{symbol.replace('/', '_')}.json")
+
+
+def fetch_market_data(
+    symbols: List[str],
+    executor: concurrent.futures.Executor,
+    cached: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, float], Dict[str, Dict[str, Any]]]:
+    """Fetch current prices and historical data for every symbol concurrently.
+
+    The batched quote requests and every ``(symbol, interval, range)`` chart
+    request are independent network calls, so all of them are submitted to
+    ``executor`` up front and run in a single fetch phase; the total wall
+    time approaches that of the slowest request rather than their sum.
+
+    Parameters
+    ----------
+    symbols:
+        The ticker symbols to fetch.
+    executor:
+        The executor on which the requests are run.
+    cached:
+        Optional mapping of symbol to the historical data previously saved
+        for it.  Intervals whose ``fetched_at`` timestamp is younger than
+        their ``HISTORICAL_TTL`` are reused instead of being downloaded, and
+        previously saved candles are kept when a download fails.
+
+    Returns
+    -------
+    tuple
+        ``(prices, historical)`` where ``prices`` is the mapping returned by
+        :func:`fetch_prices` and ``historical`` maps each symbol to
+        ``{interval: series, "fetched_at": {interval: epoch_seconds}}`` with
+        ``series`` as returned by :func:`fetch_historical`.
+    """
+    now = time.time()
+    cached = cached or {}
+    historical: Dict[str, Dict[str, Any]] = {}
+    tasks = []
+    for symbol in symbols:
+        previous = cached.get(symbol)
+        if not isinstance(previous, dict):
+            previous = {}
+        fetched_at = previous.get("fetched_at")
+        if not isinstance(fetched_at, dict):
+            fetched_at = {}
+        entry = historical[symbol] = {"fetched_at": dict(fetched_at)}
+        for interval in DERIVED_INTERVALS:
+            if interval in previous:
+                entry[interval] = previous[interval]
+        for interval, range_param in HISTORICAL_INTERVALS:
+            if interval in previous:
+                entry[interval] = previous[interval]
+                try:
+                    age = now - float(fetched_at.get(interval) or 0)
+                except (TypeError, ValueError):
+                    # Treat unparseable timestamps as expired
+                    age = float("inf")
+                if age < HISTORICAL_TTL[interval]:
+                    continue
+            tasks.append((symbol, interval, range_param))
+
+    # Submit the chart requests before blocking on the quotes so that both
+    # kinds of request are in flight at the same time.
+    history_results = executor.map(lambda t: (t, fetch_historical(*t)), tasks)
+    prices = fetch_prices(symbols, executor)
+    daily_since = int(now * 1000) - DAILY_WINDOW_MS
+    for (symbol, interval, _), series in history_results:
+        entry = historical[symbol]
+        if series["t"]:
+            for derived, source in DERIVED_INTERVALS.items():
+                if source == interval:
+                    entry[derived] = resample_weekly(series)
+            if interval == "1d":
+                series = trim_series(series, daily_since)
+            entry[interval] = series
+            entry["fetched_at"][interval] = int(now)
+        else:
+            entry.setdefault(interval, series)
+    for entry in historical.values():
+        for derived in DERIVED_INTERVALS:
+            entry.setdefault(derived, empty_series())
+    return prices, historical
+
+
+# Minimum number of seconds between two alerts for the same symbol and
+# direction.
+ALERT_RESEND_INTERVAL = 86400
+
+
+def should_resend(last_sent: Any, now_ts: float) -> bool:
+    """Return whether an alert last sent at ``last_sent`` may be sent again.
+
+    ``last_sent`` is the Unix timestamp recorded in ``alerts_log.json`` (or
+    ``None`` if the alert was never sent) and ``now_ts`` the current time,
+    computed once per run by the caller.  ISO timestamps written by older
+    versions of this script are still understood; unparseable values are
+    treated as expired.
+    """
+    if last_sent is None:
+        return True
+    try:
+        last_ts = float(last_sent)
+    except (TypeError, ValueError):
+        try:
+            last_dt = _dt.datetime.fromisoformat(str(last_sent).rstrip("Z"))
+        except ValueError:
+            return True
+        if last_dt.tzinfo is None:
+            last_dt = last_dt.replace(tzinfo=_dt.timezone.utc)
+        last_ts = last_dt.timestamp()
+    return now_ts - last_ts > ALERT_RESEND_INTERVAL
+
+
+# Comparison sign and body wording of the alerts for each direction.
+_ALERT_WORDING = {
+    "above": (">=", "superando el nivel de alerta establecido"),
+    "below": ("<=", "por debajo del nivel de alerta establecido"),
+}
+
+
+def _maybe_alert(
+    direction: str,
+    symbol: str,
+    price: float,
+    threshold: Optional[float],
+    symbol_alerts: Dict[str, Any],
+    recipient: str,
+    now_ts: float,
+    now_iso: str,
+    pending: List[Tuple[str, str, float, Tuple[str, str, str]]],
+) -> None:
+    """Queue an alert if ``price`` crossed ``threshold`` in ``direction``.
+
+    ``direction`` is either ``"above"`` or ``"below"``.  The alert is only
+    queued on ``pending`` if it was never sent before or was last sent more
+    than ``ALERT_RESEND_INTERVAL`` seconds ago.
+    """
+    if threshold is None:
+        return
+    crossed = price >= threshold if direction == "above" else price <= threshold
+    if not crossed or not should_resend(symbol_alerts.get(direction), now_ts):
+        return
+    sign, wording = _ALERT_WORDING[direction]
+    subject = f"Alerta: {symbol} {sign} {threshold}"
+    body = (f"El activo {symbol} ha alcanzado un precio de {price:.2f},\n"
+            f"{wording} ({threshold}).\n\n"
+            f"Hora UTC: {now_iso}\n")
+    pending.append((symbol, direction, price, (subject, body, recipient)))
 
 
 def update_watchlist_and_alerts(watchlist: Dict[str, Any], alerts_log: Dict[str, Any]) -> None:
@@ -206,44 +592,46 @@ def update_watchlist_and_alerts(watchlist: Dict[str, Any], alerts_log: Dict[str,
         entries.
     alerts_log:
         The alerts log dictionary loaded from ``alerts_log.json``.  Its
-        structure is {symbol: {"above": timestamp, "below": timestamp}}.
+        structure is {symbol: {"above": timestamp, "below": timestamp}}
+        where each timestamp is in Unix seconds.
     """
-    now_iso = _dt.datetime.utcnow().isoformat() + "Z"
+    now_ts = time.time()
+    now_iso = _dt.datetime.utcfromtimestamp(now_ts).isoformat() + "Z"
     assets: List[Dict[str, Any]] = watchlist.get("assets", [])
-    alerts: Dict[str, Dict[str, str]] = alerts_log.setdefault("alerts", {})
+    alerts: Dict[str, Dict[str, Any]] = alerts_log.setdefault("alerts", {})
 
     smtp_email = os.environ.get("SMTP_EMAIL")
     smtp_password = os.environ.get("SMTP_PASSWORD")
     alert_email = os.environ.get("ALERT_EMAIL", smtp_email)
     send_enabled = bool(smtp_email and smtp_password and alert_email)
+    # Alerts to send once every asset has been checked, as
+    # (symbol, direction, price, (subject, body, recipient)) tuples.
+    pending: List[Tuple[str, str, float, Tuple[str, str, str]]] = []
+
+    # Fetch all quotes and historical candlestick data up front in a single
+    # concurrent phase.  The historical data allows the front‑end to display
+    # charts without having to make live requests from the browser (which
+    # may be blocked by CORS).  Intervals still within their TTL are reused
+    # from the previously saved files to minimize network usage.
+    os.makedirs(HIST_DIR, exist_ok=True)
+    symbols = [asset["symbol"] for asset in assets if asset.get("symbol")]
+    cached = {symbol: load_json_file(historical_path(symbol)) for symbol in symbols}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        prices, historical = fetch_market_data(symbols, executor, cached)
 
     for asset in assets:
         symbol = asset.get("symbol")
         if not symbol:
             continue
-        try:
-            price = fetch_price(symbol)
-        except Exception as exc:
-            print(exc, file=sys.stderr)
+        price = prices.get(symbol)
+        if price is None:
             continue
         asset["last_price"] = price
         asset["last_updated"] = now_iso
 
-        # Generate historical candlestick data for supported intervals.  This
-        # allows the front‑end to display charts without having to make live
-        # requests from the browser (which may be blocked by CORS).  Only
-        # refresh the data once per run to minimize network usage.
-        hist_data = {
-            "4h": fetch_historical(symbol, "4h", "1mo"),
-            "1d": fetch_historical(symbol, "1d", "3mo"),
-            "1wk": fetch_historical(symbol, "1wk", "1y"),
-        }
-        # Write historical data into a separate file under the repo root.  Use
-        # a deterministic filename based on the symbol.
-        hist_filename = f"historical_{symbol.replace('/', '_')}.json"
-        hist_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), hist_filename)
+        # Write historical data into a separate file under HIST_DIR.
         try:
-            save_json_file(hist_path, hist_data)
+            save_json_file(historical_path(symbol), historical.get(symbol, {}), compact=True)
         except Exception as exc:
             print(f"Failed to save historical data for {symbol}: {exc}", file=sys.stderr)
 
@@ -251,69 +639,34 @@ def update_watchlist_and_alerts(watchlist: Dict[str, Any], alerts_log: Dict[str,
         if not send_enabled:
             continue
         symbol_alerts = alerts.setdefault(symbol, {})
-        above_threshold = asset.get("alert_above")
-        below_threshold = asset.get("alert_below")
         # Per‑asset email overrides the global alert email if defined.  This
         # allows users to configure different destinations per activo.
         asset_email = asset.get("email")
         recipient_email = asset_email or alert_email
 
-        # Price crosses above threshold
-        if above_threshold is not None and price >= above_threshold:
-            last_sent = symbol_alerts.get("above")
-            # Send only if never sent before or last alert was more than a day ago
-            send = False
-            if last_sent is None:
-                send = True
-            else:
-                try:
-                    last_dt = _dt.datetime.fromisoformat(last_sent.rstrip("Z"))
-                    if (_dt.datetime.utcnow() - last_dt).total_seconds() > 86400:
-                        send = True
-                except Exception:
-                    send = True
-            if send:
-                subject = f"Alerta: {symbol} >= {above_threshold}"
-                body = (f"El activo {symbol} ha alcanzado un precio de {price:.2f},\n"
-                        f"superando el nivel de alerta establecido ({above_threshold}).\n\n"
-                        f"Hora UTC: {now_iso}\n")
-                try:
-                    send_email(subject, body, smtp_email, smtp_password, recipient_email)
-                    symbol_alerts["above"] = now_iso
-                    print(f"Sent above alert for {symbol} at {price}")
-                except Exception as exc:
-                    print(f"Failed to send alert for {symbol}: {exc}", file=sys.stderr)
-
-        # Price crosses below threshold
-        if below_threshold is not None and price <= below_threshold:
-            last_sent = symbol_alerts.get("below")
-            send = False
-            if last_sent is None:
-                send = True
-            else:
-                try:
-                    last_dt = _dt.datetime.fromisoformat(last_sent.rstrip("Z"))
-                    if (_dt.datetime.utcnow() - last_dt).total_seconds() > 86400:
-                        send = True
-                except Exception:
-                    send = True
-            if send:
-                subject = f"Alerta: {symbol} <= {below_threshold}"
-                body = (f"El activo {symbol} ha alcanzado un precio de {price:.2f},\n"
-                        f"por debajo del nivel de alerta establecido ({below_threshold}).\n\n"
-                        f"Hora UTC: {now_iso}\n")
-                try:
-                    send_email(subject, body, smtp_email, smtp_password, recipient_email)
-                    symbol_alerts["below"] = now_iso
-                    print(f"Sent below alert for {symbol} at {price}")
-                except Exception as exc:
-                    print(f"Failed to send alert for {symbol}: {exc}", file=sys.stderr)
+        # Price crosses above or below threshold
+        _maybe_alert("above", symbol, price, asset.get("alert_above"), symbol_alerts,
+                     recipient_email, now_ts, now_iso, pending)
+        _maybe_alert("below", symbol, price, asset.get("alert_below"), symbol_alerts,
+                     recipient_email, now_ts, now_iso, pending)
+
+    if not pending:
+        return
+
+    def record_sent(index: int) -> None:
+        symbol, direction, price, _ = pending[index]
+        alerts[symbol][direction] = int(now_ts)
+        print(f"Sent {direction} alert for {symbol} at {price}")
+
+    try:
+        send_emails([message for *_, message in pending], smtp_email, smtp_password, record_sent)
+    except Exception as exc:
+        print(f"Failed to send alerts: {exc}", file=sys.stderr)
 
 
 def main() -> None:
-    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    watchlist_path = os.path.join(repo_root, "watchlist.json")
-    alerts_log_path = os.path.join(repo_root, "alerts_log.json")
+    watchlist_path = os.path.join(REPO_ROOT, "watchlist.json")
+    alerts_log_path = os.path.join(REPO_ROOT, "alerts_log.json")
 
     watchlist = load_json_file(watchlist_path) or {"assets": []}
     alerts_log = load_json_file(alerts_log_path) or {"alerts": {}}
@@ -19,18 +19,19 @@ Key features:
   timeframes (4 hours, 1 day or 1 week) using Plotly.  A horizontal line
   indicates the configured alert level.
 * Configure SMTP credentials in the sidebar.  When both an SMTP email and
-  password are provided the app starts a background thread that periodically
-  checks the watchlist and sends email notifications if prices cross the
-  configured alert thresholds.  To avoid spamming, each alert can only fire
-  once per hour per ticker.
+  password are provided the page refreshes itself every five minutes and
+  checks the watchlist on each refresh, sending email notifications if
+  prices cross the configured alert thresholds.  To avoid spamming, each
+  alert can only fire once per hour per ticker.
 
 The email service uses Gmail via SMTP over SSL.  For production deployment
 you should create an application‑specific password on your Gmail account and
 provide it in the settings panel.  Emails are sent to the address
 configured in the ``Destinatario de alertas`` field.
 
-Note: While this app provides a functional demonstration, running long‑lived
-background threads is best handled outside of Streamlit (for example via
+Note: While this app provides a functional demonstration, the in‑app checks
+only run while a browser keeps the page open.  Continuous monitoring is best
+handled outside of Streamlit (for example via
 GitHub Actions) to guarantee 24/7 availability.  The included
 ``scripts/update_prices.py`` script in this repository illustrates such
 automation.  Use the in‑app alerts for short‑term testing and rely on the
@@ -38,33 +39,46 @@ GitHub workflow for continuous monitoring.
 """
 
 import os
+import copy
 import json
 import time
 import threading
 import smtplib
+import sqlite3
+from contextlib import closing
 from email.message import EmailMessage
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 import streamlit as st
 import pandas as pd
 import yfinance as yf
 import plotly.graph_objects as go
+from streamlit_autorefresh import st_autorefresh
 
 
 # Path to the watchlist JSON file within the repository
 WATCHLIST_FILE = os.path.join(os.path.dirname(__file__), "watchlist.json")
 
+# SQLite database recording when each alert was last sent
+ALERTS_DB = os.path.join(os.path.dirname(__file__), "alerts.db")
 
-def load_watchlist() -> Dict[str, Dict[str, Any]]:
-    """Load the watchlist from the JSON file and normalise its structure.
 
-    The watchlist on disk is expected to be a JSON object keyed by ticker
-    symbol.  Each value should itself be an object (dict) containing at
-    least an ``alert`` field.  Older versions of the application or manual
-    edits may leave plain numbers or strings instead of dictionaries.  This
-    function normalises such entries into the expected dict format.  If the
-    file cannot be read or parsed a blank dictionary is returned.
+@st.cache_resource(show_spinner=False)
+def _watchlist_cache() -> Dict[str, Any]:
+    """Return the holder of the parsed watchlist shared across reruns.
+
+    Streamlit executes this script afresh on every rerun, so module globals
+    do not survive between runs; ``st.cache_resource`` keeps a single holder
+    per process instead.  It stores the parsed watchlist together with the
+    file state it was read from, so that ``watchlist.json`` is only parsed
+    again after it changes on disk.  The lock guards the holder against
+    concurrent sessions, each of which runs on its own script thread.
     """
+    return {"mtime": None, "data": {}, "lock": threading.Lock()}
+
+
+def _parse_watchlist() -> Dict[str, Dict[str, Any]]:
+    """Read ``watchlist.json`` from disk and normalise its structure."""
     try:
         with open(WATCHLIST_FILE, "r", encoding="utf-8") as f:
             data = json.load(f)
@@ -85,6 +99,34 @@ def load_watchlist() -> Dict[str, Dict[str, Any]]:
         return {}
 
 
+def load_watchlist() -> Dict[str, Dict[str, Any]]:
+    """Load the watchlist from the JSON file and normalise its structure.
+
+    The watchlist on disk is expected to be a JSON object keyed by ticker
+    symbol.  Each value should itself be an object (dict) containing at
+    least an ``alert`` field.  Older versions of the application or manual
+    edits may leave plain numbers or strings instead of dictionaries.  This
+    function normalises such entries into the expected dict format.  If the
+    file cannot be read or parsed a blank dictionary is returned.
+
+    The parsed watchlist is cached in memory across reruns and sessions and
+    only read again when the file's modification time or size changes.
+    Callers receive a copy, so they may modify it freely before passing it
+    to :func:`save_watchlist`.
+    """
+    try:
+        stat = os.stat(WATCHLIST_FILE)
+        mtime = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return {}
+    cache = _watchlist_cache()
+    with cache["lock"]:
+        if cache["mtime"] != mtime:
+            cache["data"] = _parse_watchlist()
+            cache["mtime"] = mtime
+        return copy.deepcopy(cache["data"])
+
+
 def save_watchlist(watchlist: Dict[str, Dict[str, Any]]) -> None:
     """Persist the watchlist to the JSON file."""
     try:
@@ -94,7 +136,7 @@ def save_watchlist(watchlist: Dict[str, Dict[str, Any]]) -> None:
         st.error(f"No se pudo guardar la lista de seguimiento: {exc}")
 
 
-@st.cache_data(show_spinner=False)
+@st.cache_data(ttl=60, show_spinner=False)
 def fetch_current_price(symbol: str) -> float:
     """Fetch the latest price for a given ticker using yfinance.
 
@@ -115,6 +157,47 @@ def fetch_current_price(symbol: str) -> float:
         return None
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_prices_bulk(symbols: Tuple[str, ...]) -> Dict[str, float]:
+    """Fetch the latest prices for several tickers with a single request.
+
+    All symbols are downloaded together with ``yf.download`` instead of one
+    ``yf.Ticker`` request per symbol.  Symbols missing from the bulk result
+    (for example stocks without intraday data while the market is closed)
+    fall back to :func:`fetch_current_price`.  Symbols whose price cannot be
+    fetched are omitted from the returned dictionary.
+    """
+    prices: Dict[str, float] = {}
+    if not symbols:
+        return prices
+    try:
+        data = yf.download(
+            list(symbols),
+            period="1d",
+            interval="1m",
+            group_by="ticker",
+            progress=False,
+            threads=True,
+        )
+    except Exception:
+        data = pd.DataFrame()
+    for sym in symbols:
+        try:
+            if isinstance(data.columns, pd.MultiIndex):
+                closes = data[sym]["Close"].dropna()
+            else:
+                closes = data["Close"].dropna()
+            if not closes.empty:
+                prices[sym] = float(closes.iloc[-1])
+                continue
+        except Exception:
+            pass
+        price = fetch_current_price(sym)
+        if price is not None:
+            prices[sym] = price
+    return prices
+
+
 @st.cache_data(show_spinner=False)
 def fetch_historical(symbol: str, period: str, interval: str) -> pd.DataFrame:
     """Fetch historical OHLCV data for the symbol.
@@ -157,13 +240,53 @@ def send_alert_email(subject: str, body: str) -> None:
         st.warning(f"Error al enviar correo: {e}")
 
 
+def _connect_alerts_db() -> sqlite3.Connection:
+    """Open the alerts database, creating its table if needed."""
+    conn = sqlite3.connect(ALERTS_DB)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS alerts("
+        "symbol TEXT, direction TEXT, sent_at REAL, PRIMARY KEY (symbol, direction))"
+    )
+    return conn
+
+
+def get_last_alert(symbol: str, direction: str) -> Optional[float]:
+    """Return when the alert for ``symbol`` and ``direction`` was last sent.
+
+    Returns None if it was never sent or the database cannot be read.
+    """
+    try:
+        with closing(_connect_alerts_db()) as conn:
+            row = conn.execute(
+                "SELECT sent_at FROM alerts WHERE symbol=? AND direction=?",
+                (symbol, direction),
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def record_alert(symbol: str, direction: str, sent_at: float) -> None:
+    """Persist the time at which an alert was sent."""
+    try:
+        with closing(_connect_alerts_db()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO alerts(symbol, direction, sent_at) VALUES (?, ?, ?)",
+                (symbol, direction, sent_at),
+            )
+    except sqlite3.Error as exc:
+        st.warning(f"No se pudo registrar la alerta enviada: {exc}")
+
+
 def check_alerts() -> None:
     """Check each asset in the watchlist and send an email if price crosses the alert level.
 
     Each alert is throttled so that no more than one email per hour per ticker
-    is sent.  The throttle state is stored in ``st.session_state.alerts_sent``.
+    is sent.  The throttle state is stored in the ``alerts.db`` SQLite database
+    so that it survives sessions and restarts of the app.
     """
     watchlist = load_watchlist()
+    prices = fetch_prices_bulk(tuple(watchlist.keys()))
     for symbol, meta in watchlist.items():
         alert_level = meta.get("alert")
         if alert_level is None or alert_level == "":
@@ -172,7 +295,7 @@ def check_alerts() -> None:
             alert_level_float = float(alert_level)
         except Exception:
             continue
-        price = fetch_current_price(symbol)
+        price = prices.get(symbol)
         if price is None:
             continue
         
@@ -183,9 +306,9 @@ def check_alerts() -> None:
             # This logic can be customized based on needs
             crossed = abs(price - alert_level_float) <= (alert_level_float * 0.01)  # Within 1% of alert level
             
-        last_sent_ts = st.session_state.get("alerts_sent", {}).get(symbol)
         if crossed:
             now_ts = time.time()
+            last_sent_ts = get_last_alert(symbol, "cross")
             # Only send if we haven't sent in the last hour
             if not last_sent_ts or (now_ts - last_sent_ts > 3600):
                 subject = f"Alerta de precio para {symbol}"
@@ -195,24 +318,26 @@ def check_alerts() -> None:
                 )
                 send_alert_email(subject, body)
                 # Record timestamp of this alert
-                if "alerts_sent" not in st.session_state:
-                    st.session_state.alerts_sent = {}
-                st.session_state.alerts_sent[symbol] = now_ts
+                record_alert(symbol, "cross", now_ts)
 
 
-def start_alert_thread() -> None:
-    """Start a background daemon thread to continuously check alerts.
+# Milliseconds between two automatic alert checks.
+ALERT_CHECK_INTERVAL_MS = 300_000
 
-    The thread sleeps for five minutes between checks to reduce API load.
-    """
-    def run_loop():
-        while True:
-            check_alerts()
-            # wait for 5 minutes between checks
-            time.sleep(300)
 
-    thread = threading.Thread(target=run_loop, daemon=True)
-    thread.start()
+def run_alert_tick() -> None:
+    """Check alerts once per automatic page refresh.
+
+    ``st_autorefresh`` reruns the script every ``ALERT_CHECK_INTERVAL_MS``
+    milliseconds and returns how many refreshes have happened so far.  The
+    alerts are checked inline on the main script thread when that counter
+    changes, so ordinary user interactions do not trigger extra checks and
+    no background thread is left running per session.
+    """
+    tick = st_autorefresh(interval=ALERT_CHECK_INTERVAL_MS, key="alert_tick")
+    if st.session_state.get("last_alert_tick") != tick:
+        st.session_state.last_alert_tick = tick
+        check_alerts()
 
 
 def apply_theme() -> None:
@@ -249,13 +374,9 @@ def main() -> None:
     st.set_page_config(page_title="Lista de Seguimiento de Activos", layout="wide")
 
     # Initialize session state variables
-    for key in ["email", "password", "alert_email", "dark_mode", "alerts_sent", "alert_thread_started"]:
+    for key in ["email", "password", "alert_email", "dark_mode"]:
         if key not in st.session_state:
-            if key == "alerts_sent":
-                st.session_state[key] = {}
-            elif key == "dark_mode":
-                st.session_state[key] = False
-            elif key == "alert_thread_started":
+            if key == "dark_mode":
                 st.session_state[key] = False
             else:
                 st.session_state[key] = ""
@@ -277,15 +398,13 @@ def main() -> None:
     st.session_state.dark_mode = dark_toggle
     apply_theme()
 
-    # Start alert thread if credentials available
+    # Check alerts periodically if credentials available
     if (
         st.session_state.email
         and st.session_state.password
         and st.session_state.alert_email
-        and not st.session_state.alert_thread_started
     ):
-        start_alert_thread()
-        st.session_state.alert_thread_started = True
+        run_alert_tick()
 
     st.title("Aplicación de Lista de Seguimiento de Activos")
     st.write(
@@ -298,20 +417,19 @@ def main() -> None:
     # Display the current watchlist with real‑time prices
     st.subheader("Lista de seguimiento")
     if symbols:
-        # Fetch current prices for all symbols
-        rows = []
-        for sym in symbols:
-            price = fetch_current_price(sym)
-            # FIXED: Safely obtain the alert level even if the entry isn't a dict
-            alert_level = watchlist.get(sym, {}).get("alert", "")
-            rows.append(
-                {
-                    "Ticker": sym,
-                    "Precio actual": f"{price:.2f}" if price is not None else "—",
-                    "Nivel de alerta": alert_level,
-                }
-            )
-        df = pd.DataFrame(rows)
+        # Fetch current prices for all symbols at once and build the table
+        # column by column
+        prices = fetch_prices_bulk(tuple(symbols))
+        df = pd.DataFrame(
+            {
+                "Ticker": symbols,
+                "Precio actual": [prices.get(sym) for sym in symbols],
+                "Nivel de alerta": [watchlist[sym].get("alert", "") for sym in symbols],
+            }
+        )
+        df["Precio actual"] = df["Precio actual"].map(
+            lambda x: f"{x:.2f}" if x is not None and not pd.isna(x) else "—"
+        )
         st.dataframe(df, hide_index=True)
     else:
         st.info("La lista de seguimiento está vacía.")